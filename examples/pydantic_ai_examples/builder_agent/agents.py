@@ -0,0 +1,27 @@
+"""Construction of the agents created by the Builder Agent."""
+
+from functools import lru_cache
+
+from pydantic_ai import Agent
+from pydantic_ai.models.anthropic import AnthropicModelSettings
+
+
+@lru_cache(maxsize=32)
+def get_or_build_agent(
+    model_name: str, system_prompt: str, name: str
+) -> Agent[None, str]:
+    """Get an agent for the given configuration, reusing one already built for the same configuration.
+
+    Agents don't hold any conversation state, so it's safe to share them between handoffs.
+    """
+    return Agent[None, str](
+        model_name,
+        system_prompt=system_prompt,
+        name=name,
+        # cache the system prompt and the conversation up to the latest message, so each
+        # handoff reads the previous handoff's prefix from Anthropic's prompt cache
+        model_settings=AnthropicModelSettings(
+            anthropic_cache_system_prompt=True,
+            anthropic_cache_messages=True,
+        ),
+    )
@@ -1,85 +1,27 @@
-from dataclasses import dataclass
-from typing import Optional, Literal, Union
-
-import logfire
-from pydantic import BaseModel, Field
-from rich.prompt import Prompt
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any, Optional, Union
 
 from pydantic_ai import Agent, RunContext, ModelRetry
 from pydantic_ai.messages import ModelMessage
+from pydantic_ai.models.anthropic import AnthropicModelSettings
 from pydantic_ai.usage import Usage, UsageLimits
 
-# Configure logfire - 'if-token-present' means nothing will be sent if you don't have logfire configured
-try:
-    logfire.configure(send_to_logfire='if-token-present')
-except Exception:
-    # Silently continue if logfire configuration fails
-    pass
-
-# Models to represent agent configurations and state
-
-class AgentConfig(BaseModel):
-    """Configuration for a new agent to be created."""
-    
-    system_prompt: str = Field(
-        description="The system prompt that defines the agent's role and behavior"
-    )
-    model_name: Literal[
-        'claude-3-5-sonnet-latest'
-    ] = Field(
-        default='claude-3-5-sonnet-latest',
-        description="The model to use for this agent"
-    )
-    name: str = Field(
-        description="A descriptive name for the agent"
-    )
-    description: str = Field(
-        description="A brief description of what this agent does"
-    )
-    avatar: str = Field(
-        description="An avatar for the agent"
-    )
-
-class AgentResponse(BaseModel):
-    """Response from the created agent."""
-    response: str = Field(description="The agent's response to the query")
-
-@dataclass
-class BuilderDeps:
-    """Dependencies for the Builder Agent.
-    
-    This maintains state about the currently created agent and its configuration.
-    """
-    current_config: Optional[AgentConfig] = None
-    created_agent: Optional[Agent[None, str]] = None
+from .agents import get_or_build_agent
+from .models import AgentConfig, AgentResponse, BuilderDeps
+from .prompts import BUILDER_SYSTEM_PROMPT
 
 # The Builder Agent itself
 builder_agent = Agent[BuilderDeps, Union[AgentConfig, AgentResponse]](
     'claude-3-5-sonnet-latest',  # Using Claude Sonnet for its superior capabilities
     deps_type=BuilderDeps,
     result_type=Union[AgentConfig, AgentResponse],
-    system_prompt="""You are an expert at designing AI agents. Your job is to:
-
-1. Understand what kind of agent the user wants based on their description
-2. Design an appropriate system prompt that will make the agent behave as desired
-3. Choose an appropriate model for the agent's needs
-4. Create a clear name and description for the agent
-5. Once the agent is created, hand off the conversation completely to the new agent
-
-When designing system prompts:
-- Make them clear and specific
-- Include any necessary constraints or guidelines
-- Define the agent's role and capabilities
-- Set the appropriate tone and style
-
-We will use claude-3-5-sonnet-latest for all agents as it provides excellent capabilities for:
-- Complex reasoning and analysis
-- Creative writing and generation
-- Technical understanding
-- Consistent and high-quality outputs
-
-Always validate that your configurations make sense for the user's needs.
-After creating the agent, you will hand off the conversation completely to it."""
+    system_prompt=BUILDER_SYSTEM_PROMPT,
+    # the system prompt and tool definitions are static, so mark them for Anthropic prompt caching
+    model_settings=AnthropicModelSettings(
+        anthropic_cache_system_prompt=True,
+        anthropic_cache_tools=True,
+    ),
 )
 
 @builder_agent.tool
@@ -91,12 +33,8 @@ async def create_agent(ctx: RunContext[BuilderDeps], config: AgentConfig) -> Age
     # Store the configuration for future reference
     ctx.deps.current_config = config
     
-    # Create the new agent
-    new_agent = Agent[None, str](
-        config.model_name,
-        system_prompt=config.system_prompt,
-        name=config.name,
-    )
+    # Create the new agent, or reuse one with an identical configuration
+    new_agent = get_or_build_agent(config.model_name, config.system_prompt, config.name)
     
     # Store the created agent
     ctx.deps.created_agent = new_agent
@@ -113,13 +51,16 @@ async def handoff_to_agent(ctx: RunContext[BuilderDeps], query: str) -> AgentRes
         raise ModelRetry("No agent has been created yet. Please create an agent first.")
     
     # Use streaming for the created agent's response
-    response_text = ""
+    chunks: list[str] = []
     async with ctx.deps.created_agent.run_stream(query) as result:
         async for chunk in result.stream_text(delta=True):
-            response_text += chunk
+            chunks.append(chunk)
             print(chunk, end="", flush=True)  # Stream output directly
+    response_text = ''.join(chunks)
     
-    return AgentResponse(response=response_text)
+    # the response is a `str` we built ourselves, so skip validation; never do this with
+    # JSON emitted by the LLM, only with trusted data that has already been validated
+    return AgentResponse.model_construct(response=response_text)
 
 async def chat_with_agent(agent: Agent, user_message: str, message_history: Optional[list[ModelMessage]] = None) -> str:
     """Chat directly with an agent, bypassing the terminal interface."""
@@ -127,13 +68,45 @@ async def chat_with_agent(agent: Agent, user_message: str, message_history: Opti
         user_message,
         message_history=message_history
     ) as result:
-        response_text = ""
+        chunks: list[str] = []
         async for chunk in result.stream_text(delta=True):
-            response_text += chunk
-        return response_text, result.new_messages()
+            chunks.append(chunk)
+        return ''.join(chunks), result.new_messages()
+
+@lru_cache
+def _ensure_logfire_configured() -> None:
+    """Configure logfire once, from the entry points rather than at import time."""
+    import logfire
+
+    # 'if-token-present' means nothing will be sent if you don't have logfire configured
+    try:
+        logfire.configure(send_to_logfire='if-token-present')
+    except Exception:
+        # Silently continue if logfire configuration fails
+        pass
+
+def _print_config(config: AgentConfig) -> None:
+    print(f'\nName: {config.name}')
+    print(f'Description: {config.description}')
+    print(f'Model: {config.model_name}')
+    print(f'System Prompt: {config.system_prompt}')
+    print('\nConfiguration complete! Now handing off to the created agent...')
+
+def _print_response(response: AgentResponse) -> None:
+    # the response was already streamed to the terminal by `handoff_to_agent`
+    print()
+
+# Handlers for each kind of builder result, looked up by its `kind` tag
+HANDLERS: dict[str, Callable[[Any], None]] = {
+    'config': _print_config,
+    'response': _print_response,
+}
 
 async def main():
     """Example usage of the Builder Agent."""
+    from rich.prompt import Prompt
+
+    _ensure_logfire_configured()
     # Initialize dependencies
     deps = BuilderDeps()
     
@@ -150,13 +123,8 @@ async def main():
         # Create the agent based on the description
         async with builder_agent.run_stream(request, deps=deps) as result:
             print("\nCreating agent configuration...")
-            config = await result.get_data()
-            if isinstance(config, AgentConfig):
-                print(f"\nName: {config.name}")
-                print(f"Description: {config.description}")
-                print(f"Model: {config.model_name}")
-                print(f"System Prompt: {config.system_prompt}")
-                print("\nConfiguration complete! Now handing off to the created agent...")
+            data = await result.get_data()
+            HANDLERS[data.kind](data)
             
             # Now we can interact directly with the created agent
             created_agent = deps.created_agent
@@ -183,6 +151,7 @@ async def main():
 
 # Example usage:
 async def direct_chat():
+    _ensure_logfire_configured()
     # First create the agent using builder_agent
     deps = BuilderDeps()
     async with builder_agent.run_stream("Create a friendly chat assistant", deps=deps) as result:
@@ -4,94 +4,52 @@ This module implements a Builder Agent that can design and configure other agent
 natural language descriptions, with simulated streaming output for better UX.
 """
 
-from dataclasses import dataclass
 import asyncio
-from typing import Optional, Literal, Union, List
-
-from pydantic import BaseModel, Field
-from rich.console import Console
-from rich.live import Live
-from rich.text import Text
-from rich.prompt import Prompt
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Union
 
 from pydantic_ai import Agent, RunContext, ModelRetry
-from pydantic_ai.messages import ModelMessage
+from pydantic_ai.messages import ModelMessage, ModelRequest, SystemPromptPart
+from pydantic_ai.models.anthropic import AnthropicModelSettings
 
-# Initialize rich console for pretty output
-console = Console()
+from .agents import get_or_build_agent
+from .models import AgentConfig, AgentResponse, BuilderDeps
+from .prompts import BUILDER_SYSTEM_PROMPT
 
-class AgentConfig(BaseModel):
-    """Configuration for a new agent to be created."""
-    
-    system_prompt: str = Field(
-        description="The system prompt that defines the agent's role and behavior"
-    )
-    model_name: Literal[
-        'claude-3-5-sonnet-latest'
-    ] = Field(
-        default='claude-3-5-sonnet-latest',
-        description="The model to use for this agent"
-    )
-    name: str = Field(
-        description="A descriptive name for the agent"
-    )
-    description: str = Field(
-        description="A brief description of what this agent does"
-    )
-
-class AgentResponse(BaseModel):
-    """Response from the created agent."""
-    response: str = Field(description="The agent's response to the query")
-
-@dataclass
-class BuilderDeps:
-    """Dependencies for the Builder Agent.
-    
-    This maintains state about the currently created agent and its configuration.
-    """
-    message_history: List[ModelMessage]
-    current_config: Optional[AgentConfig] = None
-    created_agent: Optional[Agent[None, str]] = None
+if TYPE_CHECKING:
+    from rich.console import Console
+
+@lru_cache
+def _console() -> 'Console':
+    """Get the rich console for pretty output, importing rich only once it's needed."""
+    from rich.console import Console
 
-    def __init__(self):
-        self.message_history = []
+    return Console()
 
 # The Builder Agent itself
 builder_agent = Agent[BuilderDeps, Union[AgentConfig, AgentResponse]](
     'claude-3-5-sonnet-latest',
     deps_type=BuilderDeps,
     result_type=Union[AgentConfig, AgentResponse],
-    system_prompt="""You are an expert at designing AI agents. Your job is to:
-
-1. Understand what kind of agent the user wants based on their description
-2. Design an appropriate system prompt that will make the agent behave as desired
-3. Choose an appropriate model for the agent's needs
-4. Create a clear name and description for the agent
-
-When designing system prompts:
-- Make them clear and specific
-- Include any necessary constraints or guidelines
-- Define the agent's role and capabilities
-- Set the appropriate tone and style
-
-We will use claude-3-5-sonnet-latest for all agents as it provides excellent capabilities for:
-- Complex reasoning and analysis
-- Creative writing and generation
-- Technical understanding
-- Consistent and high-quality outputs
-
-Always validate that your configurations make sense for the user's needs."""
+    system_prompt=BUILDER_SYSTEM_PROMPT,
+    # the system prompt and tool definitions are static, so mark them for Anthropic prompt caching
+    model_settings=AnthropicModelSettings(
+        anthropic_cache_system_prompt=True,
+        anthropic_cache_tools=True,
+    ),
 )
 
 @builder_agent.tool
 async def create_agent(ctx: RunContext[BuilderDeps], config: AgentConfig) -> AgentConfig:
     """Create a new agent with the given configuration."""
     ctx.deps.current_config = config
-    new_agent = Agent[None, str](
-        config.model_name,
-        system_prompt=config.system_prompt,
-        name=config.name,
-    )
+    new_agent = get_or_build_agent(config.model_name, config.system_prompt, config.name)
+    if new_agent is not ctx.deps.created_agent:
+        # the history belongs to the previous agent, in particular its first request carries
+        # that agent's system prompt, so start the new agent's conversation afresh
+        ctx.deps.message_history = []
+        ctx.deps.window_start = 0
     ctx.deps.created_agent = new_agent
     return config
 
@@ -100,22 +58,69 @@ async def handoff_to_agent(ctx: RunContext[BuilderDeps], query: str) -> AgentRes
     """Hand off the conversation to the created agent."""
     if not ctx.deps.created_agent:
         raise ModelRetry("No agent has been created yet. Please create an agent first.")
-    
-    result = await ctx.deps.created_agent.run(query, message_history=ctx.deps.message_history)
-    ctx.deps.message_history.extend(result.all_messages())
-    return AgentResponse(response=result.data)
-
-async def stream_text(text: str, delay: float = 0.02):
-    """Simulate streaming text output."""
-    with Live(Text(""), refresh_per_second=20) as live:
-        current_text = ""
-        for char in text:
-            current_text += char
-            live.update(Text(current_text))
-            await asyncio.sleep(delay)
+
+    result = await ctx.deps.created_agent.run(query, message_history=windowed_history(ctx.deps))
+    ctx.deps.message_history.extend(result.new_messages())
+    # the created agent's run has already validated `result.data` as a `str`, so there's
+    # nothing left for `AgentResponse` to check
+    return AgentResponse.model_construct(response=result.data)
+
+def windowed_history(deps: BuilderDeps) -> list[ModelMessage]:
+    """Get the slice of the message history to send to the created agent.
+
+    The window is append-only until it grows to `deps.reset_cache_after` messages, so between slides
+    each request's messages are the previous request's plus the new turn. Created agents mark their
+    last message as a prompt caching breakpoint (see `get_or_build_agent`), so each handoff reads
+    everything the previous handoff sent from Anthropic's prompt cache. Once the window is full it
+    slides forward to keep only its newest half, and the cache is rebuilt from that shorter prefix.
+    """
+    history = deps.message_history
+    if len(history) - deps.window_start >= deps.reset_cache_after:
+        window_start = len(history) - deps.reset_cache_after // 2
+        # the window must start with a request, not half way through a turn
+        while window_start > 0 and not isinstance(history[window_start], ModelRequest):
+            window_start -= 1
+        deps.window_start = window_start
+
+    if deps.window_start == 0:
+        return history
+    # keep the created agent's system prompt, which pydantic-ai only adds to the first request
+    # and doesn't re-add when a message history is given, but not the first user prompt
+    system_prompt_parts = [p for p in history[0].parts if isinstance(p, SystemPromptPart)]
+    return [ModelRequest(system_prompt_parts)] + history[deps.window_start:]
+
+async def stream_text(text: str, delay: float = 0.02, chunk_size: int = 40):
+    """Simulate streaming text output, writing `chunk_size` characters at a time."""
+    for start in range(0, len(text), chunk_size):
+        chunk = text[start:start + chunk_size]
+        _console().print(chunk, end='', soft_wrap=True, markup=False, highlight=False)
+        await asyncio.sleep(delay * len(chunk))
+
+async def _print_config(config: AgentConfig) -> None:
+    console = _console()
+    console.print('\n[bold blue]Created agent configuration:[/]')
+    await stream_text(f'Name: {config.name}')
+    await stream_text(f'\nDescription: {config.description}')
+    await stream_text(f'\nModel: {config.model_name}')
+    await stream_text(f'\nSystem Prompt: {config.system_prompt}')
+    console.print('\n[bold green]Configuration complete![/]')
+
+async def _print_response(response: AgentResponse) -> None:
+    console = _console()
+    console.print('\n[bold cyan]Agent response:[/]')
+    await stream_text(response.response)
+    console.print()  # Add a newline after response
+
+# Handlers for each kind of builder result, looked up by its `kind` tag
+HANDLERS: dict[str, Callable[[Any], Awaitable[None]]] = {
+    'config': _print_config,
+    'response': _print_response,
+}
 
 async def main():
     """Example usage of the Builder Agent with streaming output."""
+    from rich.prompt import Prompt
+
     deps = BuilderDeps()
     
     while True:
@@ -130,14 +135,8 @@ async def main():
         # Create the agent based on the description
         result = await builder_agent.run(request, deps=deps)
         
-        if isinstance(result.data, AgentConfig):
-            console.print("\n[bold blue]Created agent configuration:[/]")
-            await stream_text(f"Name: {result.data.name}")
-            await stream_text(f"\nDescription: {result.data.description}")
-            await stream_text(f"\nModel: {result.data.model_name}")
-            await stream_text(f"\nSystem Prompt: {result.data.system_prompt}")
-            console.print("\n[bold green]Configuration complete![/]")
-        
+        await HANDLERS[result.data.kind](result.data)
+        if result.data.kind == 'config':
             # Now we can interact with the created agent
             while True:
                 query = Prompt.ask(
@@ -150,10 +149,7 @@ async def main():
                     
                 # Get the agent's response with streaming simulation
                 result = await builder_agent.run(query, deps=deps)
-                if isinstance(result.data, AgentResponse):
-                    console.print("\n[bold cyan]Agent response:[/]")
-                    await stream_text(result.data.response)
-                    console.print()  # Add a newline after response
+                await HANDLERS[result.data.kind](result.data)
 
 if __name__ == '__main__':
     asyncio.run(main()) 
\ No newline at end of file
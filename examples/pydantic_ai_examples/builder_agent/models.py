@@ -0,0 +1,57 @@
+"""Models shared by the Builder Agent variants.
+
+Defining these once means their pydantic schemas are only built once per process,
+however many of the builder modules are imported.
+"""
+
+from __future__ import annotations as _annotations
+
+from dataclasses import dataclass, field
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelMessage
+
+
+class AgentConfig(BaseModel):
+    """Configuration for a new agent to be created."""
+
+    # tags which variant of the builder's result this is, so callers can dispatch on it
+    kind: Literal['config'] = 'config'
+    system_prompt: str = Field(
+        description="The system prompt that defines the agent's role and behavior"
+    )
+    model_name: Literal['claude-3-5-sonnet-latest'] = Field(
+        default='claude-3-5-sonnet-latest',
+        description='The model to use for this agent',
+    )
+    name: str = Field(description='A descriptive name for the agent')
+    description: str = Field(description='A brief description of what this agent does')
+    avatar: str = Field(description='An avatar for the agent')
+
+
+class AgentResponse(BaseModel):
+    """Response from the created agent."""
+
+    # tags which variant of the builder's result this is, so callers can dispatch on it
+    kind: Literal['response'] = 'response'
+    response: str = Field(description="The agent's response to the query")
+
+
+@dataclass
+class BuilderDeps:
+    """Dependencies for the Builder Agent.
+
+    This maintains state about the currently created agent and its configuration.
+    """
+
+    message_history: list[ModelMessage] = field(default_factory=list)
+    current_config: AgentConfig | None = None
+    created_agent: Agent[None, str] | None = None
+    # index of the first message in `message_history` sent to the created agent
+    window_start: int = 0
+    # once this many messages are sent to the created agent, the window slides forward rather
+    # than writing an ever longer prefix to the prompt cache
+    reset_cache_after: int = 20
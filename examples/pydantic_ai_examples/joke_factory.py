@@ -1,5 +1,12 @@
-from pydantic_ai import Agent, RunContext
-from pydantic_ai.usage import UsageLimits
+from __future__ import annotations as _annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from functools import partial
+
+from pydantic_ai import Agent, ModelRetry, RunContext
+from pydantic_ai.result import RunResult
+from pydantic_ai.usage import Usage, UsageLimits
 
 # Create the agents
 joke_selection_agent = Agent(
@@ -10,15 +17,106 @@ joke_selection_agent = Agent(
     ),
 )
 
-joke_generation_agent = Agent('openai:gpt-4o', result_type=list[str])  # Updated to available Gemini model
+joke_generation_agent = Agent(
+    'openai:gpt-4o', result_type=list[str]
+)  # Updated to available Gemini model
+
+
+@dataclass
+class _JokeRequest:
+    count: int
+    usage: Usage
+    future: asyncio.Future[list[str]]
+
+
+@dataclass
+class JokeBatcher:
+    """Coalesce `joke_factory` calls made in quick succession into a single generation request.
+
+    Requests are buffered for up to `max_wait` seconds, or until `max_batch` of them are queued,
+    then all the jokes are generated in one run of `joke_generation_agent` and sliced back to each caller.
+    Callers left short because the model returned too few jokes get a `ModelRetry` error instead.
+    Usage for the whole batch is counted against the first caller's run.
+    """
+
+    max_wait: float = 0.25
+    max_batch: int = 8
+    _pending: list[_JokeRequest] = field(init=False, default_factory=list)
+    _timer: asyncio.TimerHandle | None = field(init=False, default=None)
+    _tasks: set[asyncio.Task[RunResult[list[str]]]] = field(
+        init=False, default_factory=set
+    )
+
+    async def generate(self, count: int, usage: Usage) -> list[str]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[str]] = loop.create_future()
+        self._pending.append(_JokeRequest(count, usage, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+
+        counts = [request.count for request in batch]
+        if len(batch) == 1:
+            prompt = f'Please generate {counts[0]} jokes.'
+        else:
+            prompt = (
+                f'Please generate {sum(counts)} jokes, all different from each other. '
+                f'They will be split into groups of {", ".join(map(str, counts))}.'
+            )
+        # keep a reference to the task so it isn't garbage collected before it completes
+        task = asyncio.create_task(
+            joke_generation_agent.run(prompt, usage=batch[0].usage)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(partial(_resolve_batch, batch))
+
+
+def _resolve_batch(
+    batch: list[_JokeRequest], task: asyncio.Task[RunResult[list[str]]]
+) -> None:
+    """Hand each caller in a batch its share of the generated jokes, or the error."""
+    # callers that were cancelled while waiting already have a completed future
+    waiting = [request for request in batch if not request.future.done()]
+    if task.cancelled():
+        for request in waiting:
+            request.future.cancel()
+    elif (error := task.exception()) is not None:
+        for request in waiting:
+            request.future.set_exception(error)
+    else:
+        jokes = task.result().data
+        start = 0
+        for request in batch:
+            share = jokes[start : start + request.count]
+            start += request.count
+            if request not in waiting:
+                continue
+            if len(share) < request.count:
+                message = (
+                    f'Only {len(share)} of {request.count} jokes could be generated, '
+                    'please try again.'
+                )
+                request.future.set_exception(ModelRetry(message))
+            else:
+                request.future.set_result(share)
+
+
+joke_batcher = JokeBatcher()
+
 
 @joke_selection_agent.tool
 async def joke_factory(ctx: RunContext[None], count: int) -> list[str]:
-    r = await joke_generation_agent.run(
-        f'Please generate {count} jokes.',
-        usage=ctx.usage,
-    )
-    return r.data
+    return await joke_batcher.generate(count, ctx.usage)
+
 
 async def main():
     result = await joke_selection_agent.run(
@@ -28,6 +126,6 @@ async def main():
     print(result.data)
     print(result.usage())
 
-if __name__ == "__main__":
-    import asyncio
-    asyncio.run(main())
\ No newline at end of file
+
+if __name__ == '__main__':
+    asyncio.run(main())
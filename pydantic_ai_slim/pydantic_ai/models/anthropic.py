@@ -1,11 +1,11 @@
 from __future__ import annotations as _annotations
 
-from collections.abc import AsyncIterable, AsyncIterator
+from collections.abc import AsyncIterable, AsyncIterator, Mapping
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from json import JSONDecodeError, loads as json_loads
-from typing import Any, Literal, Union, cast, overload
+from typing import Any, Literal, TypeVar, Union, cast, overload
 
 from httpx import AsyncClient as AsyncHTTPClient
 from typing_extensions import assert_never
@@ -87,6 +87,27 @@ class AnthropicModelSettings(ModelSettings):
 
     Contains `user_id`, an external identifier for the user who is associated with the request."""
 
+    anthropic_cache_system_prompt: bool
+    """Whether to mark the system prompt as a [prompt caching](https://docs.anthropic.com/en/docs/build-with-claude/prompt-caching) breakpoint.
+
+    When enabled, the system prompt is sent as a text block with `cache_control` set to `ephemeral`, so
+    subsequent requests sharing the same system prompt can be served from Anthropic's prompt cache.
+    Note that prompts shorter than the model's minimum cacheable length (e.g. 1024 tokens for Claude 3.5 Sonnet)
+    are never cached."""
+
+    anthropic_cache_tools: bool
+    """Whether to mark the tool definitions as a [prompt caching](https://docs.anthropic.com/en/docs/build-with-claude/prompt-caching) breakpoint.
+
+    When enabled, `cache_control` is set to `ephemeral` on the last tool definition, so all tool definitions
+    are cached together (tools come before the system prompt in Anthropic's cache prefix)."""
+
+    anthropic_cache_messages: bool
+    """Whether to mark the last message as a [prompt caching](https://docs.anthropic.com/en/docs/build-with-claude/prompt-caching) breakpoint.
+
+    When enabled, `cache_control` is set to `ephemeral` on the last content block of the last message, so
+    the whole conversation so far is cached, and the next request in the same conversation, which extends it,
+    can be served from Anthropic's prompt cache up to that point."""
+
 
 @dataclass(init=False)
 class AnthropicModel(Model):
@@ -191,6 +212,9 @@ class AnthropicModel(Model):
     ) -> AnthropicMessage | AsyncStream[RawMessageStreamEvent]:
         # standalone function to make it easier to override
         tools = self._get_tools(model_request_parameters)
+        cache_tools = bool(tools) and model_settings.get('anthropic_cache_tools', False)
+        if cache_tools:
+            tools[-1] = _cache_control(tools[-1])
         tool_choice: ToolChoiceParam | None
 
         if not tools:
@@ -206,9 +230,22 @@ class AnthropicModel(Model):
 
         system_prompt, anthropic_messages = self._map_message(messages)
 
+        system: str | list[TextBlockParam] = system_prompt
+        cache_system_prompt = bool(system_prompt) and model_settings.get('anthropic_cache_system_prompt', False)
+        if cache_system_prompt:
+            system = [_cache_control(TextBlockParam(text=system_prompt, type='text'))]
+
+        cache_messages = bool(anthropic_messages) and model_settings.get('anthropic_cache_messages', False)
+        if cache_messages:
+            anthropic_messages[-1] = _cache_last_block(anthropic_messages[-1])
+
+        extra_headers: dict[str, str] | None = None
+        if cache_tools or cache_system_prompt or cache_messages:
+            extra_headers = {'anthropic-beta': _PROMPT_CACHING_BETA}
+
         return await self.client.messages.create(
             max_tokens=model_settings.get('max_tokens', 1024),
-            system=system_prompt or NOT_GIVEN,
+            system=system or NOT_GIVEN,
             messages=anthropic_messages,
             model=self._model_name,
             tools=tools or NOT_GIVEN,
@@ -218,6 +255,7 @@ class AnthropicModel(Model):
             top_p=model_settings.get('top_p', NOT_GIVEN),
             timeout=model_settings.get('timeout', NOT_GIVEN),
             metadata=model_settings.get('anthropic_metadata', NOT_GIVEN),
+            extra_headers=extra_headers,
         )
 
     def _process_response(self, response: AnthropicMessage) -> ModelResponse:
@@ -329,6 +367,28 @@ class AnthropicModel(Model):
         }
 
 
+_PROMPT_CACHING_BETA = 'prompt-caching-2024-07-31'
+
+_CacheableParamT = TypeVar('_CacheableParamT', bound=Mapping[str, Any])
+
+
+def _cache_control(param: _CacheableParamT) -> _CacheableParamT:
+    """Mark a content block or tool definition as an ephemeral prompt caching breakpoint."""
+    # `cache_control` isn't part of the stable `anthropic.types` params yet, but is accepted by the API
+    return cast(_CacheableParamT, {**param, 'cache_control': {'type': 'ephemeral'}})
+
+
+def _cache_last_block(message: MessageParam) -> MessageParam:
+    """Mark the last content block of a message as an ephemeral prompt caching breakpoint."""
+    content = message['content']
+    if isinstance(content, str):
+        blocks: list[Any] = [TextBlockParam(text=content, type='text')]
+    else:
+        blocks = list(content)
+    blocks[-1] = _cache_control(blocks[-1])
+    return MessageParam(role=message['role'], content=blocks)
+
+
 def _map_usage(message: AnthropicMessage | RawMessageStreamEvent) -> usage.Usage:
     if isinstance(message, AnthropicMessage):
         response_usage = message.usage
@@ -343,6 +343,66 @@ async def test_anthropic_specific_metadata(allow_model_requests: None) -> None:
     assert get_mock_chat_completion_kwargs(mock_client)[0]['metadata']['user_id'] == '123'
 
 
+async def test_anthropic_cache_system_prompt(allow_model_requests: None) -> None:
+    c = completion_message([TextBlock(text='world', type='text')], AnthropicUsage(input_tokens=5, output_tokens=10))
+    mock_client = MockAnthropic.create_mock(c)
+    m = AnthropicModel('claude-3-5-haiku-latest', anthropic_client=mock_client)
+    agent = Agent(m, system_prompt='this is the system prompt')
+
+    await agent.run('hello')
+    await agent.run('hello', model_settings=AnthropicModelSettings(anthropic_cache_system_prompt=True))
+    kwargs = get_mock_chat_completion_kwargs(mock_client)
+    assert kwargs[0]['system'] == 'this is the system prompt'
+    assert kwargs[0]['extra_headers'] is None
+    assert kwargs[1]['system'] == snapshot(
+        [{'text': 'this is the system prompt', 'type': 'text', 'cache_control': {'type': 'ephemeral'}}]
+    )
+    assert kwargs[1]['extra_headers'] == {'anthropic-beta': 'prompt-caching-2024-07-31'}
+
+
+async def test_anthropic_cache_tools(allow_model_requests: None) -> None:
+    c = completion_message([TextBlock(text='world', type='text')], AnthropicUsage(input_tokens=5, output_tokens=10))
+    mock_client = MockAnthropic.create_mock(c)
+    m = AnthropicModel('claude-3-5-haiku-latest', anthropic_client=mock_client)
+    agent = Agent(m, model_settings=AnthropicModelSettings(anthropic_cache_tools=True))
+
+    @agent.tool_plain
+    async def get_location(loc_name: str) -> str:
+        raise NotImplementedError
+
+    @agent.tool_plain
+    async def get_weather(lat: float, lng: float) -> str:
+        raise NotImplementedError
+
+    await agent.run('hello')
+    kwargs = get_mock_chat_completion_kwargs(mock_client)[0]
+    assert [tool.get('cache_control') for tool in kwargs['tools']] == [None, {'type': 'ephemeral'}]
+    assert kwargs['extra_headers'] == {'anthropic-beta': 'prompt-caching-2024-07-31'}
+
+
+async def test_anthropic_cache_messages(allow_model_requests: None) -> None:
+    c = completion_message([TextBlock(text='world', type='text')], AnthropicUsage(input_tokens=5, output_tokens=10))
+    mock_client = MockAnthropic.create_mock(c)
+    m = AnthropicModel('claude-3-5-haiku-latest', anthropic_client=mock_client)
+    agent = Agent(m, model_settings=AnthropicModelSettings(anthropic_cache_messages=True))
+
+    result = await agent.run('hello')
+    await agent.run('goodbye', message_history=result.new_messages())
+    kwargs = get_mock_chat_completion_kwargs(mock_client)
+    assert kwargs[0]['messages'] == snapshot(
+        [{'role': 'user', 'content': [{'text': 'hello', 'type': 'text', 'cache_control': {'type': 'ephemeral'}}]}]
+    )
+    # only the last message is marked, earlier messages are sent exactly as before
+    assert kwargs[1]['messages'] == snapshot(
+        [
+            {'role': 'user', 'content': 'hello'},
+            {'role': 'assistant', 'content': [{'text': 'world', 'type': 'text'}]},
+            {'role': 'user', 'content': [{'text': 'goodbye', 'type': 'text', 'cache_control': {'type': 'ephemeral'}}]},
+        ]
+    )
+    assert kwargs[1]['extra_headers'] == {'anthropic-beta': 'prompt-caching-2024-07-31'}
+
+
 async def test_stream_structured(allow_model_requests: None):
     """Test streaming structured responses with Anthropic's API.
 
@@ -0,0 +1,97 @@
+from __future__ import annotations as _annotations
+
+import importlib
+from types import ModuleType
+
+import pytest
+
+from pydantic_ai import RunContext
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, SystemPromptPart, TextPart, UserPromptPart
+from pydantic_ai.models.test import TestModel
+from pydantic_ai.usage import Usage
+
+from .conftest import TestEnv, try_import
+
+with try_import() as imports_successful:
+    import anthropic  # noqa: F401
+    import pydantic_ai_examples  # noqa: F401
+
+pytestmark = [
+    pytest.mark.skipif(not imports_successful(), reason='pydantic_ai_examples or anthropic not installed'),
+    pytest.mark.anyio,
+]
+
+
+@pytest.fixture
+def builder(env: TestEnv) -> ModuleType:
+    env.set('ANTHROPIC_API_KEY', 'fake-key')
+    return importlib.import_module('pydantic_ai_examples.builder_agent.builder_stream')
+
+
+def conversation(turns: int) -> list[ModelMessage]:
+    """Message history of `turns` question and answer pairs, with the system prompt on the first request."""
+    messages: list[ModelMessage] = []
+    for i in range(turns):
+        messages.append(ModelRequest([UserPromptPart(f'question {i}')]))
+        messages.append(ModelResponse([TextPart(f'answer {i}')]))
+    messages[0] = ModelRequest([SystemPromptPart('system prompt'), UserPromptPart('question 0')])
+    return messages
+
+
+def test_window_append_only(builder: ModuleType):
+    deps = builder.BuilderDeps(message_history=conversation(9))
+    assert builder.windowed_history(deps) is deps.message_history
+    assert deps.window_start == 0
+
+
+def test_window_keeps_history(builder: ModuleType):
+    # only the messages actually sent count towards `reset_cache_after`, and older ones are never dropped
+    history = conversation(20)
+    deps = builder.BuilderDeps(message_history=history, window_start=30)
+    assert builder.windowed_history(deps) == [ModelRequest([SystemPromptPart('system prompt')])] + history[30:]
+    assert deps.window_start == 30
+    assert len(deps.message_history) == 40
+
+
+def test_window_slide(builder: ModuleType):
+    history = conversation(10)
+    deps = builder.BuilderDeps(message_history=history)
+
+    window = builder.windowed_history(deps)
+    assert deps.window_start == len(history) - deps.reset_cache_after // 2
+    # only the system prompt of the first request is kept, not its user prompt
+    assert window == [ModelRequest([SystemPromptPart('system prompt')])] + history[deps.window_start :]
+
+    # the window doesn't move again until it's full, so the start of each request stays the same
+    history.extend(conversation(1))
+    assert builder.windowed_history(deps) == window + history[-2:]
+
+
+def test_window_slide_to_request(builder: ModuleType):
+    history = conversation(10)
+    history.append(ModelRequest([UserPromptPart('question')]))
+    deps = builder.BuilderDeps(message_history=history)
+
+    window = builder.windowed_history(deps)
+    # the newest half of the window would start with a response, so the window steps back one
+    assert deps.window_start == len(history) - deps.reset_cache_after // 2 - 1
+    assert isinstance(history[deps.window_start], ModelRequest)
+    assert window[1:] == history[deps.window_start :]
+
+
+async def test_create_agent_resets_history(builder: ModuleType):
+    deps = builder.BuilderDeps(message_history=conversation(10), window_start=10)
+    ctx = RunContext(deps, TestModel(), Usage(), 'prompt')
+    config = builder.AgentConfig(system_prompt='first', name='First', description='first agent', avatar='1')
+
+    await builder.create_agent(ctx, config)
+    assert deps.message_history == []
+    assert deps.window_start == 0
+
+    # recreating the same agent keeps its conversation
+    deps.message_history = history = conversation(2)
+    await builder.create_agent(ctx, config)
+    assert deps.message_history is history
+
+    await builder.create_agent(ctx, config.model_copy(update={'system_prompt': 'second'}))
+    assert deps.message_history == []
@@ -0,0 +1,105 @@
+from __future__ import annotations as _annotations
+
+import asyncio
+import importlib
+from types import ModuleType
+
+import pytest
+
+from pydantic_ai import ModelRetry
+from pydantic_ai.messages import ModelMessage, ModelResponse, ToolCallPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.usage import Usage
+
+from .conftest import TestEnv, try_import
+
+with try_import() as imports_successful:
+    import openai  # noqa: F401
+    import pydantic_ai_examples  # noqa: F401
+
+pytestmark = [
+    pytest.mark.skipif(not imports_successful(), reason='pydantic_ai_examples or openai not installed'),
+    pytest.mark.anyio,
+]
+
+
+@pytest.fixture
+def joke_factory(env: TestEnv) -> ModuleType:
+    env.set('OPENAI_API_KEY', 'fake-key')
+    return importlib.import_module('pydantic_ai_examples.joke_factory')
+
+
+def joke_model(prompts: list[str], joke_count: int | None = None) -> FunctionModel:
+    """Model which records the prompts and returns numbered jokes, `joke_count` of them or as many as asked for."""
+
+    def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        part = messages[-1].parts[-1]
+        assert isinstance(part, UserPromptPart)
+        prompts.append(part.content)
+        count = joke_count if joke_count is not None else int(part.content.split()[2])
+        jokes = [f'joke {i}' for i in range(count)]
+        return ModelResponse(parts=[ToolCallPart(info.result_tools[0].name, {'response': jokes})])
+
+    return FunctionModel(generate)
+
+
+async def test_full_batch_flush(joke_factory: ModuleType):
+    batcher = joke_factory.JokeBatcher(max_wait=60, max_batch=2)
+    prompts: list[str] = []
+    with joke_factory.joke_generation_agent.override(model=joke_model(prompts)):
+        results = await asyncio.wait_for(asyncio.gather(batcher.generate(2, Usage()), batcher.generate(3, Usage())), 1)
+
+    assert results == [['joke 0', 'joke 1'], ['joke 2', 'joke 3', 'joke 4']]
+    assert prompts == [
+        'Please generate 5 jokes, all different from each other. They will be split into groups of 2, 3.'
+    ]
+
+
+async def test_timer_flush(joke_factory: ModuleType):
+    batcher = joke_factory.JokeBatcher(max_wait=0.01)
+    prompts: list[str] = []
+    with joke_factory.joke_generation_agent.override(model=joke_model(prompts)):
+        assert await asyncio.wait_for(batcher.generate(2, Usage()), 1) == ['joke 0', 'joke 1']
+
+    assert prompts == ['Please generate 2 jokes.']
+
+
+async def test_error(joke_factory: ModuleType):
+    def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        raise RuntimeError('model failed')
+
+    batcher = joke_factory.JokeBatcher(max_wait=0.01)
+    with joke_factory.joke_generation_agent.override(model=FunctionModel(generate)):
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.generate(1, Usage()), batcher.generate(2, Usage()), return_exceptions=True), 1
+        )
+
+    assert [str(r) for r in results] == ['model failed', 'model failed']
+
+
+async def test_cancelled_caller(joke_factory: ModuleType):
+    batcher = joke_factory.JokeBatcher(max_wait=0.01)
+    prompts: list[str] = []
+    with joke_factory.joke_generation_agent.override(model=joke_model(prompts)):
+        first = asyncio.create_task(batcher.generate(1, Usage()))
+        cancelled = asyncio.create_task(batcher.generate(2, Usage()))
+        last = asyncio.create_task(batcher.generate(3, Usage()))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        results = await asyncio.wait_for(asyncio.gather(first, last), 1)
+
+    assert cancelled.cancelled()
+    assert results == [['joke 0'], ['joke 3', 'joke 4', 'joke 5']]
+
+
+async def test_short_result(joke_factory: ModuleType):
+    batcher = joke_factory.JokeBatcher(max_wait=0.01)
+    prompts: list[str] = []
+    with joke_factory.joke_generation_agent.override(model=joke_model(prompts, joke_count=2)):
+        first, second = await asyncio.wait_for(
+            asyncio.gather(batcher.generate(2, Usage()), batcher.generate(3, Usage()), return_exceptions=True), 1
+        )
+
+    assert first == ['joke 0', 'joke 1']
+    assert isinstance(second, ModelRetry)
+    assert second.message == 'Only 0 of 3 jokes could be generated, please try again.'